@@ -6,77 +6,155 @@
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import codecs
 import csv
+import functools
 import json
 import math
 import os
+import queue
 import sys
+import threading
+from collections import Counter, defaultdict
 from datetime import date, datetime
+from operator import itemgetter
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer,
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
+try:
+    import orjson
+except ImportError:  # wheel が無い環境では標準 json で動かす
+    orjson = None
 
 
 # ---------------------------------------------------------------------------
 # ユーティリティ
 # ---------------------------------------------------------------------------
 
+CSV_ENCODINGS = ["cp932", "shift_jis", "utf-8", "utf-8-sig"]
+ENCODING_SAMPLE_SIZE = 64 * 1024
+CSV_WRITE_BUFFER = 1 << 20  # CSV 書き出し時のバッファ (1 MiB)
+# BOM 付きファイルはデコードを試さずに確定する
+_BOM_ENCODINGS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detect_encoding(filepath):
+    """ファイル先頭のサンプルだけをデコードしてエンコーディングを推定する。
+    BOM があればそれで確定し、非 ASCII を含むサンプルが UTF-8 として正しければ UTF-8、
+    それ以外は CSV_ENCODINGS の順に試す。どれも合わなければ None。
+    """
+    with open(filepath, "rb") as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    for bom, enc in _BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return enc
+    # UTF-8 の日本語は cp932 としてもデコードできてしまう（文字化けする）ことが多いので先に見る。
+    # 逆に cp932 のテキストが UTF-8 として正しいバイト列になることはまず無い
+    if not sample.isascii():
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+    for enc in CSV_ENCODINGS:
+        try:
+            # サンプル末尾でマルチバイト文字が切れていてもエラーにしない
+            codecs.getincrementaldecoder(enc)().decode(sample, final=False)
+            return enc
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    return None
+
+
 def read_csv_auto_encoding(filepath, skiprows=0):
     """CSV を Shift_JIS / CP932 / UTF-8 の順に試して読み込む。
+    先頭サンプルで推定したエンコーディングを最初に試し、
+    サンプル以降でデコードに失敗した場合のみ残りの候補を順に試す。
     skiprows: 先頭から読み飛ばす行数（ヘッダー行の前にあるゴミ行）。
-    戻り値: (headers: list[str], rows: list[dict])
+    行は dict を作らず list のまま返すので、列は col_index で引く。
+    ヘッダーより短い行は "" で埋め、空行は読み飛ばす。
+    戻り値: (headers: list[str], rows: list[list[str]], col_index: dict[str, int])
     """
-    encodings = ["cp932", "shift_jis", "utf-8", "utf-8-sig"]
-    raw_lines = None
+    detected = detect_encoding(filepath)
+    encodings = list(CSV_ENCODINGS)
+    if detected is not None:
+        if detected in encodings:
+            encodings.remove(detected)
+        encodings.insert(0, detected)
     for enc in encodings:
         try:
             with open(filepath, "r", encoding=enc, newline="") as f:
-                raw_lines = f.readlines()
-            break
+                # skiprows 分だけ先頭を捨て、残りはファイルから直接パースする
+                for _ in range(skiprows):
+                    f.readline()
+                reader = csv.reader(f)
+                headers = next(reader, [])
+                width = len(headers)
+                rows = []
+                for row in reader:
+                    if not row:
+                        continue
+                    if len(row) < width:
+                        row += [""] * (width - len(row))
+                    rows.append(row)
         except (UnicodeDecodeError, UnicodeError):
             continue
+        col_index = {h: i for i, h in enumerate(headers)}
+        return headers, rows, col_index
 
-    if raw_lines is None:
-        raise UnicodeDecodeError(
-            "auto", b"", 0, 1,
-            "対応するエンコーディングが見つかりませんでした。"
-        )
+    raise UnicodeDecodeError(
+        "auto", b"", 0, 1,
+        "対応するエンコーディングが見つかりませんでした。"
+    )
 
-    # skiprows 分だけ先頭を捨てる
-    raw_lines = raw_lines[skiprows:]
-    reader = csv.DictReader(raw_lines)
-    headers = reader.fieldnames or []
-    rows = list(reader)
-    return headers, rows
+
+# 数値文字列から取り除く桁区切り（半角・全角カンマ）
+_NUM_TRANS = str.maketrans("", "", ",，")
 
 
 def to_number(value):
     """カンマ区切り文字列を float に変換する。変換不能なら 0.0。"""
     if value is None:
         return 0.0
-    s = str(value).replace(",", "").replace("，", "").strip()
-    if s == "":
-        return 0.0
+    # 前後の空白は float() 自体が無視し、空文字・空白のみは ValueError になる
     try:
-        return float(s)
+        num = float(str(value).translate(_NUM_TRANS))
     except ValueError:
         return 0.0
+    # "nan" / "inf" も float() は通すが、統計計算や JSON 保存で壊れるので 0.0 扱い
+    return num if math.isfinite(num) else 0.0
+
+
+# 表示用の数値フォーマッタ（セルごとに書式文字列を解釈しないよう事前に束縛）
+fmt0 = "{:,.0f}".format
+fmt1 = "{:,.1f}".format
+fmt2 = "{:,.2f}".format
+
+
+class CalculationError(Exception):
+    """計算を中断すべきエラー。title はメッセージボックスの見出しに使う。"""
+
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+        self.message = message
 
 
 # ---------------------------------------------------------------------------
 # PDF 用フォント登録
 # ---------------------------------------------------------------------------
+# reportlab は import が重いので、起動時ではなく PDF 出力時に各関数の中で読み込む
 
+@functools.lru_cache(maxsize=1)
 def _register_japanese_font():
-    """Windows 環境の日本語フォントを探して登録する。"""
+    """Windows 環境の日本語フォントを探して登録する。
+    結果はキャッシュし、2回目以降の PDF 出力ではフォント探索・登録を行わない。
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
     candidates = [
         # Windows
         os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts", "msgothic.ttc"),
@@ -99,6 +177,61 @@ def _register_japanese_font():
     return "Helvetica"
 
 
+@functools.lru_cache(maxsize=None)
+def _pdf_styles(font_name):
+    """発注 PDF 用の段落スタイルを作る（フォントごとにキャッシュ）。
+    戻り値: (title, normal, date)
+    """
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    styles = getSampleStyleSheet()
+    style_title = ParagraphStyle(
+        "TitleJa", parent=styles["Title"],
+        fontName=font_name, fontSize=16, leading=22,
+    )
+    style_normal = ParagraphStyle(
+        "NormalJa", parent=styles["Normal"],
+        fontName=font_name, fontSize=9, leading=12,
+    )
+    style_date = ParagraphStyle(
+        "DateJa", parent=styles["Normal"],
+        fontName=font_name, fontSize=10, leading=14,
+    )
+    return style_title, style_normal, style_date
+
+
+ORDER_PDF_HEADER = ("日付", "コード", "医薬品名", "発注必要数", "安全在庫")
+
+
+@functools.lru_cache(maxsize=None)
+def _order_table_style(font_name):
+    """発注 PDF の表スタイル（フォントごとにキャッシュ）。"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        # ヘッダー
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#3a3a3a")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), font_name),
+        ("FONTSIZE", (0, 0), (-1, 0), 9),
+        ("LEADING", (0, 0), (-1, 0), 12),
+        # データ行
+        ("FONTNAME", (0, 1), (-1, -1), font_name),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("LEADING", (0, 1), (-1, -1), 12),  # Paragraph の行と高さを揃える
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f5f5f5")]),
+        # 枠線
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        # 位置
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN", (3, 1), (4, -1), "RIGHT"),  # 数値列（ヘッダーは左寄せのまま）
+        ("TOPPADDING", (0, 0), (-1, -1), 3),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+        ("LEFTPADDING", (0, 0), (-1, -1), 4),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+    ])
+
 
 # ---------------------------------------------------------------------------
 # 使用量 蓄積・統計管理
@@ -111,13 +244,14 @@ class UsageHistory:
     {
         "<薬剤コード>": {
             "name": "薬品名",
-            "records": [
-                {"date": "2026-02-19", "quantity": 120.0},
+            "records": {
+                "2026-02-19": 120.0,
                 ...
-            ]
+            }
         },
         ...
     }
+    旧形式（records が {"date", "quantity"} のリスト）は読み込み時に変換する。
     """
 
     DEFAULT_FILENAME = "usage_history.json"
@@ -129,76 +263,140 @@ class UsageHistory:
             else:
                 directory = os.path.dirname(os.path.abspath(__file__))
         self.filepath = os.path.join(directory, self.DEFAULT_FILENAME)
+        self._stats_cache = None
+        self.reload()
+
+    def reload(self):
+        """ファイルを読み直してメモリ上の状態を作り直す。"""
         self.data = self._load()
+        self._mtime = self._file_mtime()
+        # 日付ごとの登録コード数。get_record_count 用に書き込みのたび差分更新する
+        self._date_counts = Counter()
+        for info in self.data.values():
+            self._date_counts.update(info["records"].keys())
+        self._dirty = True
+
+    def _file_mtime(self):
+        try:
+            return os.path.getmtime(self.filepath)
+        except OSError:
+            return None
+
+    def reload_if_changed(self):
+        """ファイルの更新時刻が前回の読み書き時から変わっている場合だけ読み直す。"""
+        if self._file_mtime() != self._mtime:
+            self.reload()
 
     def _load(self):
+        """ファイルを読み込む。読めなかった場合は空で始め、_load_error に理由を残す
+        （_save で上書きする前にファイルを退避する）。
+        """
+        self._load_error = None
         if not os.path.exists(self.filepath):
             return {}
         try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
+            with open(self.filepath, "rb") as f:
+                raw = f.read()
+            if orjson is None:
+                data = json.loads(raw)
+            else:
+                try:
+                    data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    # 標準 json で書かれた NaN / Infinity を含むファイルは orjson では読めない
+                    data = json.loads(raw)
+        except Exception as e:
+            self._load_error = e
             return {}
 
+        # 旧形式: records = [{"date": ..., "quantity": ...}, ...] → {date: quantity}
+        # 数値でない値（null / NaN / Infinity）は to_number と同じく 0.0 にそろえる
+        for info in data.values():
+            records = info.get("records")
+            if isinstance(records, list):
+                records = info["records"] = {r["date"]: r["quantity"] for r in records}
+            elif records is None:
+                records = info["records"] = {}
+            for d, q in records.items():
+                if not isinstance(q, (int, float)) or not math.isfinite(q):
+                    records[d] = 0.0
+        return data
+
     def _save(self):
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        if self._load_error is not None and os.path.exists(self.filepath):
+            # 読めなかったファイルは消さずに別名で残しておく
+            stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            os.replace(self.filepath, f"{self.filepath}.{stamp}.broken")
+        self._load_error = None
+        if orjson is None:
+            with open(self.filepath, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+        else:
+            with open(self.filepath, "wb") as f:
+                f.write(orjson.dumps(self.data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        # 自分で書いた分は再読み込み不要
+        self._mtime = self._file_mtime()
 
-    def add_records(self, schedule_rows, code_key, name_key, qty_key, record_date=None):
+    def add_records(self, schedule_rows, code_idx, name_idx, qty_idx, record_date=None):
         """使用予定データの行リストを蓄積する。
+        *_idx は read_csv_auto_encoding が返す行の列インデックス。
         同一日付 + 同一コードの重複は上書き（二重登録防止）。
         """
         if record_date is None:
             record_date = date.today().isoformat()
 
+        data = self.data
+        added = 0
         for row in schedule_rows:
-            code = str(row.get(code_key, "")).strip()
+            code = row[code_idx].strip()
             if not code:
                 continue
-            name = str(row.get(name_key, ""))
-            qty = to_number(row.get(qty_key))
-
-            if code not in self.data:
-                self.data[code] = {"name": name, "records": []}
-
-            # 同一日付の既存レコードを探して上書き
-            records = self.data[code]["records"]
-            found = False
-            for rec in records:
-                if rec["date"] == record_date:
-                    rec["quantity"] = qty
-                    found = True
-                    break
-            if not found:
-                records.append({"date": record_date, "quantity": qty})
-
-            # 名前を最新に更新
-            self.data[code]["name"] = name
+            name = row[name_idx]
+            qty = to_number(row[qty_idx])
 
+            entry = data.get(code)
+            if entry is None:
+                entry = data[code] = {"name": name, "records": {}}
+            else:
+                entry["name"] = name  # 名前を最新に更新
+
+            # 同一日付の既存レコードは上書き
+            records = entry["records"]
+            if record_date not in records:
+                added += 1
+            records[record_date] = qty
+
+        if added:
+            self._date_counts[record_date] += added
+
+        self._dirty = True
         self._save()
 
     def get_statistics(self):
         """全薬剤の統計サマリーを返す。
-        戻り値: list[dict] — code, name, count, mean, stddev, min, max, latest
+        データに変更が無ければ前回の計算結果を使い回す。
+        戻り値: list[dict] — code, name, count, mean, stddev, safety(平均+1σ), min, max, latest
         """
+        if not self._dirty and self._stats_cache is not None:
+            return list(self._stats_cache)
+
         result = []
         for code, info in self.data.items():
-            records = info.get("records", [])
+            records = info["records"]
             if not records:
                 continue
-            quantities = [r["quantity"] for r in records]
+            quantities = list(records.values())
             n = len(quantities)
             mean = sum(quantities) / n
             if n >= 2:
-                variance = sum((q - mean) ** 2 for q in quantities) / (n - 1)
+                variance = sum([(q - mean) ** 2 for q in quantities]) / (n - 1)
                 stddev = math.sqrt(variance)
             else:
                 stddev = 0.0
 
-            # 最新日付
-            sorted_recs = sorted(records, key=lambda r: r["date"])
-            latest_date = sorted_recs[-1]["date"]
-            latest_qty = sorted_recs[-1]["quantity"]
+            # 最新日付（キーが ISO 日付なので最大値がそのまま最新）
+            latest_date = max(records)
+            latest_qty = records[latest_date]
 
             result.append({
                 "code": code,
@@ -206,41 +404,45 @@ class UsageHistory:
                 "count": n,
                 "mean": mean,
                 "stddev": stddev,
+                "safety": mean + stddev,  # 安全在庫 = 平均 + 1σ
                 "min": min(quantities),
                 "max": max(quantities),
                 "latest_date": latest_date,
                 "latest_qty": latest_qty,
             })
-        return result
+        self._stats_cache = result
+        self._dirty = False
+        return list(result)
 
     def get_detail(self, code):
         """指定コードの全レコードを日付昇順で返す。"""
         info = self.data.get(code, {})
-        records = info.get("records", [])
-        return sorted(records, key=lambda r: r["date"])
+        records = info.get("records", {})
+        return [{"date": d, "quantity": q} for d, q in sorted(records.items())]
 
     def delete_record(self, code, record_date):
         """指定コード・日付のレコードを1件削除する。"""
         if code in self.data:
-            self.data[code]["records"] = [
-                r for r in self.data[code]["records"] if r["date"] != record_date
-            ]
+            if record_date in self.data[code]["records"]:
+                del self.data[code]["records"][record_date]
+                self._date_counts[record_date] -= 1
+                if self._date_counts[record_date] <= 0:
+                    del self._date_counts[record_date]
             if not self.data[code]["records"]:
                 del self.data[code]
+            self._dirty = True
             self._save()
 
     def clear_all(self):
         """全データを削除する。"""
         self.data = {}
+        self._date_counts.clear()
+        self._dirty = True
         self._save()
 
     def get_record_count(self):
         """蓄積されている日付数（ユニーク日付の数）を返す。"""
-        dates = set()
-        for info in self.data.values():
-            for r in info.get("records", []):
-                dates.add(r["date"])
-        return len(dates)
+        return len(self._date_counts)
 
     def import_from_csv(self, filepath):
         """エクスポートした統計CSVまたは履歴CSVを読み込んで蓄積データに統合する。
@@ -249,34 +451,31 @@ class UsageHistory:
           A) 統計サマリーCSV — カラム: コード, 薬品名, ... (最新日付, 最新量を1レコードとして取り込む)
           B) 履歴CSV — カラム: コード, 薬品名, 日付, 使用予定量
         """
-        headers, rows = read_csv_auto_encoding(filepath, skiprows=0)
+        headers, rows, col = read_csv_auto_encoding(filepath, skiprows=0)
 
         imported = 0
 
         # フォーマットB: 履歴CSV（「日付」カラムがある場合）
         if "日付" in headers and "使用予定量" in headers and "コード" in headers:
+            i_code, i_date, i_qty = col["コード"], col["日付"], col["使用予定量"]
+            i_name = col.get("薬品名")
             for row in rows:
-                code = str(row.get("コード", "")).strip()
+                code = row[i_code].strip()
                 if not code:
                     continue
-                name = str(row.get("薬品名", ""))
-                qty = to_number(row.get("使用予定量"))
-                rec_date = str(row.get("日付", "")).strip()
+                name = row[i_name] if i_name is not None else ""
+                qty = to_number(row[i_qty])
+                rec_date = row[i_date].strip()
                 if not rec_date:
                     continue
 
                 if code not in self.data:
-                    self.data[code] = {"name": name, "records": []}
+                    self.data[code] = {"name": name, "records": {}}
 
                 records = self.data[code]["records"]
-                found = False
-                for rec in records:
-                    if rec["date"] == rec_date:
-                        rec["quantity"] = qty
-                        found = True
-                        break
-                if not found:
-                    records.append({"date": rec_date, "quantity": qty})
+                if rec_date not in records:
+                    self._date_counts[rec_date] += 1
+                records[rec_date] = qty
 
                 if name:
                     self.data[code]["name"] = name
@@ -284,28 +483,25 @@ class UsageHistory:
 
         # フォーマットA: 統計サマリーCSV（「最新日付」「最新量」カラムがある場合）
         elif "最新日付" in headers and "最新量" in headers and "コード" in headers:
+            i_code, i_date, i_qty = col["コード"], col["最新日付"], col["最新量"]
+            i_name = col.get("薬品名")
             for row in rows:
-                code = str(row.get("コード", "")).strip()
+                code = row[i_code].strip()
                 if not code:
                     continue
-                name = str(row.get("薬品名", ""))
-                qty = to_number(row.get("最新量"))
-                rec_date = str(row.get("最新日付", "")).strip()
+                name = row[i_name] if i_name is not None else ""
+                qty = to_number(row[i_qty])
+                rec_date = row[i_date].strip()
                 if not rec_date:
                     continue
 
                 if code not in self.data:
-                    self.data[code] = {"name": name, "records": []}
+                    self.data[code] = {"name": name, "records": {}}
 
                 records = self.data[code]["records"]
-                found = False
-                for rec in records:
-                    if rec["date"] == rec_date:
-                        rec["quantity"] = qty
-                        found = True
-                        break
-                if not found:
-                    records.append({"date": rec_date, "quantity": qty})
+                if rec_date not in records:
+                    self._date_counts[rec_date] += 1
+                records[rec_date] = qty
 
                 if name:
                     self.data[code]["name"] = name
@@ -318,14 +514,89 @@ class UsageHistory:
                 "  統計CSV: コード, 薬品名, ..., 最新日付, 最新量"
             )
 
+        self._dirty = True
         self._save()
         return imported
 
 
+# ---------------------------------------------------------------------------
+# ツリー表示用の行変換（列の並びは各タブの cols と一致させる）
+# ---------------------------------------------------------------------------
+
+# ソートキー（列名 → itemgetter）。各行 dict は列名のキーを必ず持つので既定値は不要
+_GETTERS = {
+    c: itemgetter(c)
+    for c in (
+        "code", "name", "unit", "stock", "scheduled", "surplus", "shortage",
+        "safety", "price", "cost",
+        "count", "mean", "stddev", "min", "max", "latest_date", "latest_qty",
+    )
+}
+
+
+def surplus_row_values(r):
+    """返品候補 1 件を表示用タプルにする。"""
+    return (
+        r["code"],
+        r["name"],
+        r["unit"],
+        fmt1(r["stock"]),
+        fmt1(r["scheduled"]),
+        fmt1(r["surplus"]),
+        fmt2(r["price"]),
+    )
+
+
+def shortage_row_values(r):
+    """発注候補 1 件を表示用タプルにする。"""
+    return (
+        r["code"],
+        r["name"],
+        r["unit"],
+        fmt1(r["stock"]),
+        fmt1(r["scheduled"]),
+        fmt1(r["shortage"]),
+        fmt1(r["safety"]) if r["safety"] > 0 else "-",
+        fmt2(r["price"]),
+        fmt0(r["cost"]),
+    )
+
+
+def stats_row_values(r):
+    """統計サマリー 1 件を表示用タプルにする。"""
+    return (
+        r["code"],
+        r["name"],
+        r["count"],
+        fmt1(r["mean"]),
+        fmt1(r["stddev"]),
+        fmt1(r["safety"]),
+        fmt1(r["min"]),
+        fmt1(r["max"]),
+        r["latest_date"],
+        fmt1(r["latest_qty"]),
+    )
+
+
+def sort_rows(rows, order, col, ascending):
+    """rows をその場で col 列の昇順/降順に安定ソートし、新しい並び順 (col, ascending) を返す。
+    order は rows の現在の並び順（不明なら None）。既にその並びならソートしない。
+    同値の行は直前の並び順を保つ。同じ列の逆順も reverse() では同値の行が逆転するので
+    sort で行う（並び済みのリストは Timsort がほぼ線形時間で処理する）。
+    """
+    if order != (col, ascending):
+        rows.sort(key=_GETTERS[col], reverse=not ascending)
+    return (col, ascending)
+
+
 # ---------------------------------------------------------------------------
 # メイン GUI
 # ---------------------------------------------------------------------------
 
+CALC_POLL_MS = 50  # 計算結果キューを見に行く間隔
+TREE_FILL_BATCH = 500  # ツリーへ一度に挿入する行数
+
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -354,12 +625,20 @@ class App(tk.Tk):
         self.surplus_sort_asc = True
         self.shortage_sort_col = None
         self.shortage_sort_asc = True
+        # 各リストの実際の並び順 (列, 昇順か)。ツールバーのボタンでも変わるので別に持つ
+        self.surplus_order = None
+        self.shortage_order = None
+        # ワーカースレッドからの計算結果受け渡し用
+        self._calc_queue = queue.Queue()
+        # 分割挿入中のツリー → 次バッチの after ID
+        self._fill_jobs = {}
 
         # 使用量蓄積
         self.usage_history = UsageHistory()
         self.stats_data = []
         self.stats_sort_col = None
         self.stats_sort_asc = True
+        self.stats_order = None
 
         self._build_ui()
 
@@ -556,28 +835,14 @@ class App(tk.Tk):
     # ---- 統計タブ: 操作 ----
     def _refresh_stats(self):
         """蓄積データから統計を再計算してツリーを更新する。"""
-        self.usage_history = UsageHistory()  # ファイルを再読み込み
+        self.usage_history.reload_if_changed()  # 外部で更新されていれば再読み込み
         self.stats_data = self.usage_history.get_statistics()
+        self.stats_order = None
         self.stats_info_var.set(f"蓄積データ: {self.usage_history.get_record_count()} 日分")
         self._refresh_stats_tree()
 
     def _refresh_stats_tree(self):
-        tree = self.stats_tree
-        tree.delete(*tree.get_children())
-        for r in self.stats_data:
-            safety = r["mean"] + r["stddev"]  # 平均 + 1σ
-            tree.insert("", tk.END, values=(
-                r["code"],
-                r["name"],
-                r["count"],
-                f'{r["mean"]:,.1f}',
-                f'{r["stddev"]:,.1f}',
-                f'{safety:,.1f}',
-                f'{r["min"]:,.1f}',
-                f'{r["max"]:,.1f}',
-                r["latest_date"],
-                f'{r["latest_qty"]:,.1f}',
-            ))
+        self._fill_tree(self.stats_tree, list(map(stats_row_values, self.stats_data)))
 
     def _sort_stats_toggle(self, col):
         if self.stats_sort_col == col:
@@ -585,24 +850,10 @@ class App(tk.Tk):
         else:
             self.stats_sort_col = col
             self.stats_sort_asc = False
-        key_map = {
-            "code": "code", "name": "name", "count": "count",
-            "mean": "mean", "stddev": "stddev",
-            "safety": None,  # 計算列
-            "min": "min", "max": "max",
-            "latest_date": "latest_date", "latest_qty": "latest_qty",
-        }
-        if col == "safety":
-            self.stats_data.sort(
-                key=lambda r: r["mean"] + r["stddev"],
-                reverse=not self.stats_sort_asc,
-            )
-        else:
-            k = key_map.get(col, col)
-            self.stats_data.sort(
-                key=lambda r: r.get(k, 0),
-                reverse=not self.stats_sort_asc,
-            )
+        # 列名と統計 dict のキーは一致している（safety も get_statistics で計算済み）
+        self.stats_order = sort_rows(
+            self.stats_data, self.stats_order, col, self.stats_sort_asc
+        )
         self._refresh_stats_tree()
 
     def _show_detail(self):
@@ -617,7 +868,7 @@ class App(tk.Tk):
         tree = self.detail_tree
         tree.delete(*tree.get_children())
         for rec in records:
-            tree.insert("", tk.END, values=(rec["date"], f'{rec["quantity"]:,.1f}'))
+            tree.insert("", tk.END, values=(rec["date"], fmt1(rec["quantity"])))
 
     def _delete_selected_record(self):
         """下段で選択中の履歴レコードを1件削除する。"""
@@ -644,7 +895,7 @@ class App(tk.Tk):
         remaining = self.usage_history.get_detail(code)
         self.detail_tree.delete(*self.detail_tree.get_children())
         for rec in remaining:
-            self.detail_tree.insert("", tk.END, values=(rec["date"], f'{rec["quantity"]:,.1f}'))
+            self.detail_tree.insert("", tk.END, values=(rec["date"], fmt1(rec["quantity"])))
         self.status_var.set(f"レコード削除: {code} / {record_date}")
 
     def _clear_all_history(self):
@@ -670,21 +921,22 @@ class App(tk.Tk):
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            with open(path, "w", encoding="utf-8-sig", newline="", buffering=CSV_WRITE_BUFFER) as f:
                 writer = csv.writer(f)
                 writer.writerow([
                     "コード", "薬品名", "記録回数", "平均", "標準偏差(σ)",
                     "安全在庫(平均+1σ)", "最小", "最大", "最新日付", "最新量",
                 ])
-                for r in self.stats_data:
-                    safety = r["mean"] + r["stddev"]
-                    writer.writerow([
+                writer.writerows(
+                    [
                         r["code"], r["name"], r["count"],
                         f'{r["mean"]:.1f}', f'{r["stddev"]:.1f}',
-                        f'{safety:.1f}',
+                        f'{r["safety"]:.1f}',
                         f'{r["min"]:.1f}', f'{r["max"]:.1f}',
                         r["latest_date"], f'{r["latest_qty"]:.1f}',
-                    ])
+                    ]
+                    for r in self.stats_data
+                )
             self.status_var.set(f"統計CSV保存完了: {os.path.basename(path)}")
             messagebox.showinfo("保存完了", f"ファイルを保存しました。\n{path}")
         except Exception as e:
@@ -744,23 +996,77 @@ class App(tk.Tk):
             messagebox.showwarning("未選択", "使用予定ファイルが選択されていません。")
             return
 
+        # 安全在庫辞書を構築 {コード: 平均+1σ}（usage_history はメインスレッドでのみ触る）
+        safety_dict = {
+            stat["code"]: stat["safety"] for stat in self.usage_history.get_statistics()
+        }
+
+        # 読み込み・集計はワーカースレッドで行い、UI を固めない
+        self.calc_btn.config(state=tk.DISABLED)
+        self.status_var.set("計算中…")
+        threading.Thread(
+            target=self._calculate_worker,
+            args=(self.inventory_path, self.schedule_path, safety_dict),
+            daemon=True,
+        ).start()
+        self.after(CALC_POLL_MS, self._poll_calc_queue)
+
+    def _calculate_worker(self, inv_path, sch_path, safety_dict):
+        """ワーカースレッド本体。Tk には触れず、結果はキューに積むだけにする。"""
+        try:
+            result = self._calculate(
+                inv_path, sch_path, safety_dict,
+                progress=lambda text: self._calc_queue.put(("status", text)),
+            )
+        except CalculationError as e:
+            self._calc_queue.put(("error", e.title, e.message))
+        except Exception as e:
+            self._calc_queue.put(("error", "計算エラー", f"計算に失敗しました。\n{e}"))
+        else:
+            self._calc_queue.put(("done", result))
+
+    def _poll_calc_queue(self):
+        """ワーカーの進捗・結果をメインスレッドで受け取る。結果が届くまで定期的に見に行く。"""
+        while True:
+            try:
+                kind, *payload = self._calc_queue.get_nowait()
+            except queue.Empty:
+                self.after(CALC_POLL_MS, self._poll_calc_queue)
+                return
+            if kind == "status":
+                self.status_var.set(payload[0])
+            elif kind == "done":
+                self._on_calc_done(*payload)
+                return
+            else:
+                self._on_calc_error(*payload)
+                return
+
+    @staticmethod
+    def _calculate(inv_path, sch_path, safety_dict, progress=None):
+        """在庫ファイルと使用予定ファイルから返品候補・発注候補を算出する。
+        Tk には触れないのでワーカースレッドから呼べる。
+        progress を渡すと、処理の段階ごとに状況メッセージを渡して呼ぶ。
+        戻り値: (surplus_list, shortage_list, sch_rows, (code_idx, name_idx, qty_idx))
+        """
+        if progress is None:
+            progress = lambda text: None
+
+        progress("在庫ファイルを読み込み中…")
         try:
-            inv_headers, inv_rows = read_csv_auto_encoding(self.inventory_path, skiprows=0)
+            inv_headers, inv_rows, inv_col = read_csv_auto_encoding(inv_path, skiprows=0)
         except UnicodeDecodeError as e:
-            messagebox.showerror("読み込みエラー", f"在庫ファイルの文字コードを判定できませんでした。\n{e}")
-            return
+            raise CalculationError("読み込みエラー", f"在庫ファイルの文字コードを判定できませんでした。\n{e}")
         except Exception as e:
-            messagebox.showerror("読み込みエラー", f"在庫ファイルの読み込みに失敗しました。\n{e}")
-            return
+            raise CalculationError("読み込みエラー", f"在庫ファイルの読み込みに失敗しました。\n{e}")
 
+        progress("使用予定ファイルを読み込み中…")
         try:
-            sch_headers, sch_rows = read_csv_auto_encoding(self.schedule_path, skiprows=4)
+            sch_headers, sch_rows, sch_col = read_csv_auto_encoding(sch_path, skiprows=4)
         except UnicodeDecodeError as e:
-            messagebox.showerror("読み込みエラー", f"使用予定ファイルの文字コードを判定できませんでした。\n{e}")
-            return
+            raise CalculationError("読み込みエラー", f"使用予定ファイルの文字コードを判定できませんでした。\n{e}")
         except Exception as e:
-            messagebox.showerror("読み込みエラー", f"使用予定ファイルの読み込みに失敗しました。\n{e}")
-            return
+            raise CalculationError("読み込みエラー", f"使用予定ファイルの読み込みに失敗しました。\n{e}")
 
         # カラム存在チェック
         inv_key = "レセコンコード"
@@ -771,69 +1077,71 @@ class App(tk.Tk):
 
         missing_inv = required_inv - set(inv_headers)
         if missing_inv:
-            messagebox.showerror(
+            raise CalculationError(
                 "カラムエラー",
                 f"在庫ファイルに必要なカラムがありません:\n{', '.join(missing_inv)}\n\n"
                 f"検出されたカラム:\n{', '.join(inv_headers)}"
             )
-            return
 
         missing_sch = required_sch - set(sch_headers)
         if missing_sch:
-            messagebox.showerror(
+            raise CalculationError(
                 "カラムエラー",
                 f"使用予定ファイルに必要なカラムがありません:\n{', '.join(missing_sch)}\n\n"
                 f"検出されたカラム:\n{', '.join(sch_headers)}"
             )
-            return
-
-        # 在庫辞書を構築 {コード: row}
-        inv_dict = {}
-        for row in inv_rows:
-            code = str(row.get(inv_key, "")).strip()
-            if code:
-                inv_dict[code] = row
 
-        # 使用予定辞書を構築 {コード: row}
-        sch_dict = {}
+        # 列インデックスはループの外で一度だけ解決する
+        i_inv_code, i_stock = inv_col[inv_key], inv_col["在庫数"]
+        i_inv_name, i_unit = inv_col["薬品名"], inv_col["単位"]
+        i_sch_code, i_scheduled = sch_col[sch_key], sch_col["使用予定量"]
+        i_sch_name, i_price = sch_col["薬剤名"], sch_col["薬価"]
+
+        progress(f"集計中…（在庫 {len(inv_rows)} 行 / 使用予定 {len(sch_rows)} 行）")
+
+        # 在庫・使用予定を 1 つの辞書に集約 {コード: 集計値}
+        # 使用予定→在庫の順に流し込むので、薬品名・単位は在庫ファイル側が優先される
+        # 行数ぶん回るループなので、グローバル関数・メソッドはローカルに束縛しておく
+        ton = to_number
+        merged = defaultdict(lambda: {
+            "stock": 0.0, "scheduled": 0.0, "price": 0.0, "name": "", "unit": "",
+        })
         for row in sch_rows:
-            code = str(row.get(sch_key, "")).strip()
+            code = row[i_sch_code].strip()
             if code:
-                sch_dict[code] = row
-
-        # 安全在庫辞書を構築 {コード: 平均+1σ}
-        safety_dict = {}
-        for stat in self.usage_history.get_statistics():
-            safety_dict[stat["code"]] = stat["mean"] + stat["stddev"]
-
-        # マージ対象: 両方に存在するコード + 片方だけのコード
-        all_codes = set(inv_dict.keys()) | set(sch_dict.keys())
+                entry = merged[code]
+                entry["scheduled"] = ton(row[i_scheduled])
+                entry["price"] = ton(row[i_price])
+                entry["name"] = row[i_sch_name]
+        for row in inv_rows:
+            code = row[i_inv_code].strip()
+            if code:
+                entry = merged[code]
+                entry["stock"] = ton(row[i_stock])
+                entry["name"] = row[i_inv_name]
+                entry["unit"] = row[i_unit]
 
         surplus_list = []
         shortage_list = []
-
-        for code in all_codes:
-            inv_row = inv_dict.get(code)
-            sch_row = sch_dict.get(code)
-
-            stock = to_number(inv_row.get("在庫数")) if inv_row else 0.0
-            scheduled = to_number(sch_row.get("使用予定量")) if sch_row else 0.0
-            price = to_number(sch_row.get("薬価")) if sch_row else 0.0
-            safety = safety_dict.get(code, 0.0)
-
-            name = ""
-            unit = ""
-            if inv_row:
-                name = inv_row.get("薬品名", "")
-                unit = inv_row.get("単位", "")
-            elif sch_row:
-                name = sch_row.get("薬剤名", "")
-                unit = ""
+        surplus_append = surplus_list.append
+        shortage_append = shortage_list.append
+        safety_get = safety_dict.get
+        surplus_values = surplus_row_values
+        shortage_values = shortage_row_values
+
+        for code, entry in merged.items():
+            stock = entry["stock"]
+            scheduled = entry["scheduled"]
+            price = entry["price"]
+            name = entry["name"]
+            unit = entry["unit"]
+            safety = safety_get(code, 0.0)
 
             diff = stock - scheduled  # 正=余剰, 負=不足
 
+            # "_display" は表示用タプル。ソートのたびに整形し直さないよう一度だけ作る
             if diff > 0:
-                surplus_list.append({
+                r = {
                     "code": code,
                     "name": name,
                     "unit": unit,
@@ -841,10 +1149,12 @@ class App(tk.Tk):
                     "scheduled": scheduled,
                     "surplus": diff,
                     "price": price,
-                })
+                }
+                r["_display"] = surplus_values(r)
+                surplus_append(r)
             elif diff < 0:
                 shortage_val = abs(diff)
-                shortage_list.append({
+                r = {
                     "code": code,
                     "name": name,
                     "unit": unit,
@@ -854,21 +1164,37 @@ class App(tk.Tk):
                     "safety": safety,
                     "price": price,
                     "cost": shortage_val * price,
-                })
-
-        self.surplus_data = surplus_list
-        self.shortage_data = shortage_list
+                }
+                r["_display"] = shortage_values(r)
+                shortage_append(r)
 
         # 初期ソート: 返品候補→薬価高い順、発注候補→概算金額高い順
-        self.surplus_data.sort(key=lambda r: r["price"], reverse=True)
-        self.shortage_data.sort(key=lambda r: r["cost"], reverse=True)
+        surplus_list.sort(key=_GETTERS["price"], reverse=True)
+        shortage_list.sort(key=_GETTERS["cost"], reverse=True)
+
+        return surplus_list, shortage_list, sch_rows, (i_sch_code, i_sch_name, i_scheduled)
+
+    def _on_calc_error(self, title, message):
+        self.calc_btn.config(state=tk.NORMAL)
+        self.status_var.set("計算を中断しました。")
+        messagebox.showerror(title, message)
+
+    def _on_calc_done(self, result):
+        """計算結果を画面に反映する（メインスレッド）。"""
+        surplus_list, shortage_list, sch_rows, (code_idx, name_idx, qty_idx) = result
+        self.calc_btn.config(state=tk.NORMAL)
 
+        self.surplus_data = surplus_list
+        self.shortage_data = shortage_list
+        # _calculate の初期ソートと合わせる
+        self.surplus_order = ("price", False)
+        self.shortage_order = ("cost", False)
         self._refresh_surplus_tree()
         self._refresh_shortage_tree()
 
         # 使用予定データを蓄積
         self.usage_history.add_records(
-            sch_rows, code_key=sch_key, name_key="薬剤名", qty_key="使用予定量"
+            sch_rows, code_idx=code_idx, name_idx=name_idx, qty_idx=qty_idx
         )
         self._refresh_stats()
 
@@ -887,41 +1213,40 @@ class App(tk.Tk):
         )
 
     # ---- ツリー更新 ----
+    def _fill_tree(self, tree, rows):
+        """ツリーの中身を rows（表示用タプルのリスト）で置き換える。
+        文字列整形は呼び出し側で済ませておき、ここでは Tk 呼び出しだけを行う。
+        件数が多いと一度に挿入する間 UI が固まるので、TREE_FILL_BATCH 件ずつ
+        after で区切って挿入する。途中で再度呼ばれたら残りの挿入は取り消す。
+        """
+        job = self._fill_jobs.pop(tree, None)
+        if job is not None:
+            self.after_cancel(job)
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+        self._fill_tree_batch(tree, rows, 0)
+
+    def _fill_tree_batch(self, tree, rows, start):
+        end = start + TREE_FILL_BATCH
+        # ttk.Treeview.insert のオプション整形を通さず、Tcl コマンドを直接呼ぶ
+        call, path = tree.tk.call, str(tree)
+        for values in rows[start:end]:
+            call(path, "insert", "", "end", "-values", values)
+        if end < len(rows):
+            self._fill_jobs[tree] = self.after(1, self._fill_tree_batch, tree, rows, end)
+        else:
+            self._fill_jobs.pop(tree, None)
+
     def _refresh_surplus_tree(self):
-        tree = self.surplus_tree
-        tree.delete(*tree.get_children())
-        for r in self.surplus_data:
-            tree.insert("", tk.END, values=(
-                r["code"],
-                r["name"],
-                r["unit"],
-                f'{r["stock"]:,.1f}',
-                f'{r["scheduled"]:,.1f}',
-                f'{r["surplus"]:,.1f}',
-                f'{r["price"]:,.2f}',
-            ))
+        self._fill_tree(self.surplus_tree, [r["_display"] for r in self.surplus_data])
 
     def _refresh_shortage_tree(self):
-        tree = self.shortage_tree
-        tree.delete(*tree.get_children())
-        for r in self.shortage_data:
-            safety = r.get("safety", 0.0)
-            safety_str = f'{safety:,.1f}' if safety > 0 else "-"
-            tree.insert("", tk.END, values=(
-                r["code"],
-                r["name"],
-                r["unit"],
-                f'{r["stock"]:,.1f}',
-                f'{r["scheduled"]:,.1f}',
-                f'{r["shortage"]:,.1f}',
-                safety_str,
-                f'{r["price"]:,.2f}',
-                f'{r["cost"]:,.0f}',
-            ))
+        self._fill_tree(self.shortage_tree, [r["_display"] for r in self.shortage_data])
 
     # ---- ソート ----
     def _sort_surplus(self, col, ascending):
-        self.surplus_data.sort(key=lambda r: r.get(col, 0), reverse=not ascending)
+        self.surplus_order = sort_rows(self.surplus_data, self.surplus_order, col, ascending)
         self._refresh_surplus_tree()
 
     def _sort_surplus_toggle(self, col):
@@ -933,7 +1258,7 @@ class App(tk.Tk):
         self._sort_surplus(col, self.surplus_sort_asc)
 
     def _sort_shortage(self, col, ascending):
-        self.shortage_data.sort(key=lambda r: r.get(col, 0), reverse=not ascending)
+        self.shortage_order = sort_rows(self.shortage_data, self.shortage_order, col, ascending)
         self._refresh_shortage_tree()
 
     def _sort_shortage_toggle(self, col):
@@ -971,11 +1296,11 @@ class App(tk.Tk):
             return
 
         try:
-            with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            with open(path, "w", encoding="utf-8-sig", newline="", buffering=CSV_WRITE_BUFFER) as f:
                 writer = csv.writer(f)
                 writer.writerow(headers)
-                for r in data:
-                    writer.writerow([r[c] for c in columns])
+                # itemgetter(*columns) で 1 行ぶんのタプルを C 側でまとめて取り出す
+                writer.writerows(map(itemgetter(*columns), data))
             self.status_var.set(f"保存完了: {os.path.basename(path)}")
             messagebox.showinfo("保存完了", f"ファイルを保存しました。\n{path}")
         except Exception as e:
@@ -1007,6 +1332,11 @@ class App(tk.Tk):
 
     def _build_order_pdf(self, filepath):
         """発注候補データから PDF を生成する。"""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+
         font_name = _register_japanese_font()
         today_str = date.today().strftime("%Y年%m月%d日")
 
@@ -1019,24 +1349,7 @@ class App(tk.Tk):
             bottomMargin=15 * mm,
         )
 
-        styles = getSampleStyleSheet()
-        style_title = ParagraphStyle(
-            "TitleJa", parent=styles["Title"],
-            fontName=font_name, fontSize=16, leading=22,
-        )
-        style_normal = ParagraphStyle(
-            "NormalJa", parent=styles["Normal"],
-            fontName=font_name, fontSize=9, leading=12,
-        )
-        style_header = ParagraphStyle(
-            "HeaderJa", parent=styles["Normal"],
-            fontName=font_name, fontSize=9, leading=12,
-            textColor=colors.white,
-        )
-        style_date = ParagraphStyle(
-            "DateJa", parent=styles["Normal"],
-            fontName=font_name, fontSize=10, leading=14,
-        )
+        style_title, style_normal, style_date = _pdf_styles(font_name)
 
         elements = []
 
@@ -1046,53 +1359,34 @@ class App(tk.Tk):
         elements.append(Paragraph(f"作成日: {today_str}", style_date))
         elements.append(Spacer(1, 6 * mm))
 
-        # テーブルデータ構築
-        header_row = [
-            Paragraph("日付", style_header),
-            Paragraph("コード", style_header),
-            Paragraph("医薬品名", style_header),
-            Paragraph("発注必要数", style_header),
-            Paragraph("安全在庫", style_header),
-        ]
-        table_data = [header_row]
-
-        for r in self.shortage_data:
-            safety = r.get("safety", 0.0)
-            safety_str = f'{safety:,.1f}' if safety > 0 else "-"
-            row = [
-                Paragraph(today_str, style_normal),
-                Paragraph(str(r["code"]), style_normal),
-                Paragraph(str(r["name"]), style_normal),
-                Paragraph(f'{r["shortage"]:,.1f}', style_normal),
-                Paragraph(safety_str, style_normal),
-            ]
-            table_data.append(row)
+        # テーブルデータ構築（ヘッダーも文字列のまま。色・フォントは TableStyle で指定）
+        table_data = [list(ORDER_PDF_HEADER)]
 
         # カラム幅
         page_w = A4[0] - 30 * mm  # 左右マージン除外
-        col_widths = [26 * mm, 28 * mm, page_w - 26 * mm - 28 * mm - 24 * mm - 24 * mm, 24 * mm, 24 * mm]
+        name_w = page_w - 26 * mm - 28 * mm - 24 * mm - 24 * mm
+        col_widths = [26 * mm, 28 * mm, name_w, 24 * mm, 24 * mm]
+
+        # 折り返しが必要になり得るのは医薬品名だけ。それも列幅に収まる名前は文字列のまま渡し、
+        # はみ出すものだけ Paragraph にする（Paragraph の組版コストは行数に比例して効く）。
+        # フォントは TableStyle で指定する
+        name_fit_w = name_w - 8  # 左右パディング 4pt ずつ
+        string_width = pdfmetrics.stringWidth
+        for r in self.shortage_data:
+            safety = r["safety"]
+            name = str(r["name"])
+            if string_width(name, font_name, 9) > name_fit_w:
+                name = Paragraph(name, style_normal)
+            table_data.append([
+                today_str,
+                r["code"],
+                name,
+                fmt1(r["shortage"]),
+                fmt1(safety) if safety > 0 else "-",
+            ])
 
         table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        table.setStyle(TableStyle([
-            # ヘッダー
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#3a3a3a")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("FONTNAME", (0, 0), (-1, 0), font_name),
-            ("FONTSIZE", (0, 0), (-1, 0), 9),
-            # データ行
-            ("FONTNAME", (0, 1), (-1, -1), font_name),
-            ("FONTSIZE", (0, 1), (-1, -1), 9),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f5f5f5")]),
-            # 枠線
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            # 位置
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN", (3, 0), (4, -1), "RIGHT"),
-            ("TOPPADDING", (0, 0), (-1, -1), 3),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-        ]))
+        table.setStyle(_order_table_style(font_name))
 
         elements.append(table)
 